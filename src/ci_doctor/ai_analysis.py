@@ -1,48 +1,97 @@
 """AI-powered analysis of CI failures using OpenAI."""
 from __future__ import annotations
 from typing import List, Optional
+import asyncio
 import json
+import re
 
 
-def analyze_with_ai(
+# Lowercase literals that mark a log line as error-related. Matching is
+# case-insensitive, so these cover error/Error/ERROR etc.
+ERROR_KEYWORDS = ("error", "failed", "fatal", "exception", "traceback", "assertion", "exit code", "exit status")
+ERROR_RE = re.compile("|".join(map(re.escape, ERROR_KEYWORDS)), re.IGNORECASE)
+
+
+# Cap on concurrent OpenAI requests when several jobs failed
+AI_CONCURRENCY = 5
+
+# Log excerpt size per prompt, in approximate tokens, and the longest single
+# line kept (a minified bundle or stack dump can be tens of KB on one line)
+PROMPT_TOKEN_BUDGET = 3500
+MAX_LINE_CHARS = 1000
+
+
+async def analyze_with_ai(
     workflow_name: str,
     failing_jobs: List[dict],
-    log_lines: List[str],
-    error_lines: List[str],
     api_key: str
 ) -> Optional[str]:
     """
     Use OpenAI to analyze a CI failure and provide suggestions.
-    
-    Returns a concise analysis and suggested fix, or None if analysis fails.
+
+    Each failing job (a dict with 'name', 'conclusion' and 'log_lines') gets
+    its own request, issued concurrently, so every job is diagnosed from its
+    own logs rather than from one fused blob.
+
+    Returns a concise analysis and suggested fix per job, or an error message.
     """
     try:
-        from openai import OpenAI
-        
-        client = OpenAI(api_key=api_key)
-        
-        # Prepare context
-        job_summary = []
-        for job in failing_jobs:
-            job_summary.append(f"- {job['name']}: {job.get('conclusion', 'unknown')}")
-        
-        # Focus on the most recent error lines
-        recent_logs = "\n".join(log_lines[-100:])  # Last 100 lines
-        recent_errors = "\n".join(error_lines[-20:])  # Last 20 error lines
-        
-        prompt = f"""Analyze this CI/CD failure and provide a concise diagnosis.
+        from openai import AsyncOpenAI
+    except ImportError:
+        return "AI analysis requires OpenAI package. Install with: pip install 'ci-doctor[ai]' or pip install -e '.[ai]'"
+
+    semaphore = asyncio.Semaphore(AI_CONCURRENCY)
+    # One client per call, shared by all jobs: its connection pool belongs to
+    # the running event loop, so it must not outlive this call
+    client = AsyncOpenAI(api_key=api_key, max_retries=3, timeout=30)
+
+    async def diagnose(job: dict) -> str:
+        async with semaphore:
+            try:
+                response = await client.chat.completions.create(
+                    model="gpt-4o-mini",  # Using cheaper, faster model
+                    messages=[
+                        {"role": "system", "content": "You are a CI/CD expert helping diagnose build failures. Be concise and actionable."},
+                        {"role": "user", "content": _build_prompt(workflow_name, job)}
+                    ],
+                    max_tokens=200,
+                    temperature=0.3  # Lower temperature for more deterministic outputs
+                )
+                return response.choices[0].message.content.strip()
+            except Exception as e:
+                return f"AI analysis failed: {str(e)}"
+
+    async with client:
+        results = await asyncio.gather(*(diagnose(job) for job in failing_jobs))
+
+    if len(results) == 1:
+        return results[0]
+    return "\n\n".join(f"{job['name']}:\n{text}" for job, text in zip(failing_jobs, results))
+
+
+def _build_prompt(workflow_name: str, job: dict) -> str:
+    log_lines = [_clip(line) for line in job.get('log_lines') or []]
+    error_lines = extract_error_lines(log_lines)
+
+    # Focus on the most recent lines, errors first, within a token budget
+    error_budget = min(PROMPT_TOKEN_BUDGET // 2, sum(map(_approx_tokens, error_lines)))
+    errors = _tail_within(error_lines, error_budget)
+    logs = _tail_within(log_lines, PROMPT_TOKEN_BUDGET - sum(map(_approx_tokens, errors)))
+    recent_logs = "\n".join(logs)
+    recent_errors = "\n".join(errors)
+
+    return f"""Analyze this CI/CD failure and provide a concise diagnosis.
 
 Workflow: {workflow_name}
 
-Failed Jobs:
-{chr(10).join(job_summary)}
+Failed Job: {job['name']} ({job.get('conclusion') or 'unknown'})
 
-Recent Logs (last 100 lines):
+Recent Logs:
 ```
 {recent_logs}
 ```
 
-Key Error Messages (last 20 lines):
+Key Error Messages:
 ```
 {recent_errors}
 ```
@@ -54,34 +103,38 @@ Please provide:
 
 Keep the response under 150 words total. Be specific and actionable."""
 
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",  # Using cheaper, faster model
-            messages=[
-                {"role": "system", "content": "You are a CI/CD expert helping diagnose build failures. Be concise and actionable."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=200,
-            temperature=0.3  # Lower temperature for more deterministic outputs
-        )
-        
-        return response.choices[0].message.content.strip()
-        
-    except ImportError:
-        return "AI analysis requires OpenAI package. Install with: pip install 'ci-doctor[ai]' or pip install -e '.[ai]'"
-    except Exception as e:
-        return f"AI analysis failed: {str(e)}"
+
+def _approx_tokens(text: str) -> int:
+    # OpenAI tokenizers average roughly four characters per token on logs/code
+    return len(text) // 4 + 1
+
+
+def _clip(line: str) -> str:
+    return line if len(line) <= MAX_LINE_CHARS else line[:MAX_LINE_CHARS] + "…"
+
+
+def _tail_within(lines: List[str], budget: int) -> List[str]:
+    """Return the longest suffix of lines whose approximate token count fits the budget."""
+    kept: List[str] = []
+    for line in reversed(lines):
+        cost = _approx_tokens(line)
+        if cost > budget:
+            break
+        budget -= cost
+        kept.append(line)
+    kept.reverse()
+    return kept
 
 
 def extract_error_lines(log_lines: List[str]) -> List[str]:
     """Extract lines that likely contain error information."""
-    error_patterns = ['error', 'Error', 'ERROR', 'failed', 'Failed', 'FAILED', 
-                     'fatal', 'Fatal', 'FATAL', 'Exception', 'Traceback', 
-                     'assertion', 'AssertionError', 'exit code', 'exit status']
-    
+    # Lowercase each line once and probe the literals with plain substring
+    # search; this is several times faster than running the regex per line.
     error_lines = []
     for line in log_lines:
-        if any(pattern in line for pattern in error_patterns):
-            error_lines.append(line)
-    
+        low = line.lower()
+        for keyword in ERROR_KEYWORDS:
+            if keyword in low:
+                error_lines.append(line)
+                break
     return error_lines
-
@@ -1,10 +1,17 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import BinaryIO, Optional, List, Dict, Any
+import asyncio
+import shutil
 import sys
 from .providers.base import BaseProvider, RunMeta, JobMeta, CompareMeta
-from .utils import iso_to_dt, duration_ms, median_ms, extract_failing_step_logs
+from .utils import iso_to_dt, duration_ms, median_ms, LogZipIndex
+
+
+LOCK_SUFFIXES = ("package-lock.json", "yarn.lock", "pnpm-lock.yaml", "poetry.lock", "requirements.txt", "Pipfile.lock", "go.sum", "Cargo.lock")
+WORKFLOW_SEGMENTS = (".github/workflows/", "ci.yml", "ci.yaml")
+DOCKERFILE_SUFFIXES = ("dockerfile", ".dockerfile")
 
 
 @dataclass
@@ -37,99 +44,123 @@ def gen_suspects(run: RunMeta, jobs: List[JobMeta], cmp: Optional[CompareMeta],
         dur = duration_ms(iso_to_dt(run.started_at), iso_to_dt(run.updated_at))
         if dur > baseline_p50_ms * 1.5:
             suspects.append("Duration spike vs median → cache miss, dependency install, or external service slowdown.")
-    # Lockfile / deps
+    # Lockfile / deps, workflow and Dockerfile changes, in a single pass
     if cmp:
-        filenames = [f.get("filename", "") for f in (cmp.files or [])]
-        lock_suffixes = ["package-lock.json","yarn.lock","pnpm-lock.yaml","poetry.lock","requirements.txt","Pipfile.lock","go.sum","Cargo.lock"]
-        if any(name.endswith(s) for name in filenames for s in lock_suffixes):
+        lock = workflow = docker = False
+        for f in (cmp.files or []):
+            name = f.get("filename", "")
+            if name.endswith(LOCK_SUFFIXES):
+                lock = True
+            if any(seg in name for seg in WORKFLOW_SEGMENTS):
+                workflow = True
+            if name.lower().endswith(DOCKERFILE_SUFFIXES):
+                docker = True
+            if lock and workflow and docker:
+                break
+        if lock:
             suspects.append("Dependency/lockfile changes may have broken build or invalidated caches.")
-        wf_names = [".github/workflows/", "ci.yml", "ci.yaml", ".github/workflows/ci.yaml", ".github/workflows/ci.yml"]
-        if any(any(seg in name for seg in wf_names) for name in filenames):
+        if workflow:
             suspects.append("Workflow changes detected → runner image, permissions, or cache keys altered.")
-        if any(name.lower().endswith(("dockerfile", ".dockerfile")) for name in filenames):
+        if docker:
             suspects.append("Dockerfile changes → base image/layer differences causing failures.")
     if run.event in {"workflow_dispatch", "repository_dispatch"}:
         suspects.append("Manual/dispatch trigger → verify inputs/secrets.")
     return suspects[:3]
 
 
+async def _download_logs(provider: BaseProvider, run: RunMeta) -> Optional[BinaryIO]:
+    """Download the run's logs ZIP, or return None (with a warning) if that fails."""
+    try:
+        # Streamed to a temp file rather than held as one bytes object
+        return await provider.download_logs_zip(run=run)
+    except Exception as e:
+        print(f"Warning: Could not download logs: {e}", file=sys.stderr)
+        return None
+
+
+async def _no_logs() -> None:
+    return None
+
+
 async def analyze(provider: BaseProvider, *, run_url: str, sample_limit: int = 50, want_logs: bool = False, save_logs_dir: Optional[Path] = None) -> Report:
-    # 1) fetch run, jobs, workflow
+    # 1) fetch run, then everything that only depends on the run concurrently:
+    # jobs, workflow, and successes for baseline + last success
     run = await provider.get_run(run_url=run_url)
-    jobs = await provider.list_run_jobs(run=run)
-    wf_name = await provider.get_workflow_name(run=run)
+    jobs, wf_name, successes = await asyncio.gather(
+        provider.list_run_jobs(run=run),
+        provider.get_workflow_name(run=run),
+        provider.list_successful_runs(run=run, limit=sample_limit),
+    )
     failing_jobs = pick_failing_jobs(jobs)
 
-    # 2) successes for baseline + last success
-    successes = await provider.list_successful_runs(run=run, limit=sample_limit)
-    # last success before this run
+    # 2) last success before this run
     cur_start = iso_to_dt(run.started_at)
-    last_success: Optional[RunMeta] = None
-    durations: List[int] = []
-    for r in successes:
-        durations.append(duration_ms(iso_to_dt(r.started_at), iso_to_dt(r.updated_at)))
-        if iso_to_dt(r.started_at) < cur_start and not last_success:
-            last_success = r
+    # Parse each sample's timestamps exactly once
+    starts = [iso_to_dt(r.started_at) for r in successes]
+    durations = [duration_ms(start, iso_to_dt(r.updated_at)) for start, r in zip(starts, successes)]
+    # Successes come newest first, so the first one that started earlier wins
+    last_success: Optional[RunMeta] = next((r for r, start in zip(successes, starts) if start < cur_start), None)
     baseline_p50 = median_ms(durations) if durations else None
 
-    # 3) compare
-    cmp = await provider.compare_since_last_success(current=run, last_success=last_success)
+    # 3) compare, concurrently with 4) logs - automatically fetched for failing builds.
+    # The ZIP can be tens of MB, so only download it when explicitly requested
+    # or when a failing job has a failed step whose log can be extracted.
+    is_failed = (run.conclusion or "").lower() in {"failure", "failed", "cancelled"}
+    needs_logs = want_logs or (is_failed and any(j.failing_step for j in failing_jobs))
+    cmp, blob = await asyncio.gather(
+        provider.compare_since_last_success(current=run, last_success=last_success),
+        _download_logs(provider, run) if needs_logs else _no_logs(),
+    )
 
-    # 4) logs - automatically fetch for failing builds
     logs_path: Optional[Path] = None
-    
-    # Download logs if build failed or explicitly requested
-    is_failed = (run.conclusion or "").lower() in {"failure", "failed", "cancelled"}
-    cancellation_reason: Optional[str] = None
-    if is_failed or want_logs:
+    if blob is not None:
         try:
-            blob = await provider.download_logs_zip(run=run)
-            
-            
-            # Extract logs for all failing jobs
+            # Extract logs for all failing jobs, parsing the archive only once
             if is_failed and failing_jobs:
-                for job in failing_jobs:
-                    # Find the failing step for this job
-                    failing_step = None
-                    for step in (job.steps or []):
-                        if (step.get("conclusion") or "").lower() in {"failure", "failed", "cancelled"}:
-                            failing_step = step
-                            break
-                    
-                    failing_step_name = failing_step.get("name") if failing_step else None
-                    job.log_lines = extract_failing_step_logs(blob, job.name, failing_step_name, max_lines=50)
-
-            # Best-effort cancellation reason inference
-            if (run.conclusion or "").lower() == "cancelled":
-                # Heuristics:
-                # 1) If any job failed (not cancelled), cancellation likely followed a failure elsewhere
-                any_failure = any((j.conclusion or "").lower() in {"failure", "failed"} for j in jobs)
-                any_cancel = any((j.conclusion or "").lower() == "cancelled" for j in jobs)
-                if any_failure and any_cancel:
-                    cancellation_reason = "Cancelled after a failure in another job"
-                else:
-                    # 2) Look for common log phrases
-                    text_snippets: List[str] = []
-                    for j in failing_jobs:
-                        if j.log_lines:
-                            text_snippets.extend(j.log_lines)
-                    joined = "\n".join(text_snippets).lower()
-                    if "timeout" in joined or "timed out" in joined:
-                        cancellation_reason = "Timeout reached"
-                    elif "the operation was canceled" in joined or "the operation was cancelled" in joined:
-                        cancellation_reason = "Operation canceled (manual, concurrency, or timeout)"
-                    else:
-                        cancellation_reason = None
-            
+                with LogZipIndex(blob) as index:
+                    # Members are independent and zlib releases the GIL while
+                    # inflating, so each job's log is extracted in a worker thread
+                    results = await asyncio.gather(*(
+                        asyncio.to_thread(index.extract, job.name, job.failing_step.get("name") if job.failing_step else None, max_lines=50)
+                        for job in failing_jobs
+                    ))
+                    for job, log_lines in zip(failing_jobs, results):
+                        job.log_lines = log_lines
+
             # Save to disk if explicitly requested (via --save-logs flag)
             if save_logs_dir:
                 save_logs_dir.mkdir(parents=True, exist_ok=True)
                 path = save_logs_dir / f"run-{run.id}-logs.zip"
-                path.write_bytes(blob)
+                blob.seek(0)
+                with path.open("wb") as fh:
+                    shutil.copyfileobj(blob, fh)
                 logs_path = path
         except Exception as e:
             # Log the error for debugging but don't fail the whole analysis
             print(f"Warning: Could not extract logs: {e}", file=sys.stderr)
+        finally:
+            blob.close()
+
+    # Best-effort cancellation reason inference
+    cancellation_reason: Optional[str] = None
+    if (run.conclusion or "").lower() == "cancelled":
+        # Heuristics:
+        # 1) If any job failed (not cancelled), cancellation likely followed a failure elsewhere
+        any_failure = any((j.conclusion or "").lower() in {"failure", "failed"} for j in jobs)
+        any_cancel = any((j.conclusion or "").lower() == "cancelled" for j in jobs)
+        if any_failure and any_cancel:
+            cancellation_reason = "Cancelled after a failure in another job"
+        else:
+            # 2) Look for common log phrases (only present if logs were downloaded)
+            text_snippets: List[str] = []
+            for j in failing_jobs:
+                if j.log_lines:
+                    text_snippets.extend(j.log_lines)
+            joined = "\n".join(text_snippets).lower()
+            if "timeout" in joined or "timed out" in joined:
+                cancellation_reason = "Timeout reached"
+            elif "the operation was canceled" in joined or "the operation was cancelled" in joined:
+                cancellation_reason = "Operation canceled (manual, concurrency, or timeout)"
 
     # 5) suspects
     suspects = gen_suspects(run, jobs, cmp, baseline_p50)
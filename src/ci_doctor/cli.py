@@ -4,20 +4,15 @@ import json
 from pathlib import Path
 import typer
 from rich.console import Console
-from rich.panel import Panel
-from rich.rule import Rule
-from dotenv import load_dotenv
 
 from .analysis import analyze as analyze_run
-from .render import render_report, report_to_json
 from .providers.github_provider import GitHubProvider
-from .ai_analysis import analyze_with_ai, extract_error_lines
+from .ai_analysis import analyze_with_ai
 
 
 # SECURITY: This CLI tool is 100% read-only. It only performs GET requests
 # to fetch and analyze CI run data. No modifications, creations, or deletions.
 app = typer.Typer(help="CI Doctor: analyze a CI run URL and get a diagnosis (read-only).")
-console = Console()
 
 
 DEFAULT_TIMEOUT = 10.0
@@ -29,13 +24,19 @@ def cmd_analyze(
     token: str | None = typer.Option(None, "--token", help="GitHub token (or env GITHUB_TOKEN)"),
     ai: bool = typer.Option(False, "--ai", help="Enable AI suggestions (placeholder)"),
     save_logs: bool = typer.Option(False, "--save-logs", help="Download logs ZIP to ./artifacts"),
-    no_cache: bool = typer.Option(True, "--no-cache/--cache", help="Disable conditional HTTP cache"),
+    no_cache: bool = typer.Option(True, "--no-cache/--cache", help="Disable the on-disk HTTP cache (~/.cache/ci-doctor)"),
     max_samples: int = typer.Option(50, "--max-samples", help="Max successful runs to sample for baseline"),
     timeout: float = typer.Option(DEFAULT_TIMEOUT, "--timeout", help="HTTP timeout seconds"),
     format_: str = typer.Option("pretty", "--format", help="pretty|json", case_sensitive=False),
 ):
     """Analyze a GitHub Actions run and print a compact diagnosis."""
-    load_dotenv()
+    json_output = format_.lower() == "json"
+    # Keep stdout clean for the JSON document; notices go to stderr instead
+    console = Console(stderr=json_output)
+    if os.environ.get("CI_DOCTOR_DOTENV", "1") == "1":
+        from dotenv import load_dotenv
+
+        load_dotenv()
     gh_token = token or os.getenv("GITHUB_TOKEN")
     if not gh_token:
         console.print("[red]Missing GitHub token.[/red] Set --token or GITHUB_TOKEN env.")
@@ -64,32 +65,30 @@ def cmd_analyze(
     ai_analysis = None
     if ai and openai_key and report.failing_jobs:
         console.print("[dim]Analyzing with AI...[/dim]")
-        # Prepare job data for AI
-        job_data = []
-        all_log_lines = []
-        for job in report.failing_jobs:
-            job_data.append({
-                'name': job.name,
-                'conclusion': job.conclusion,
-            })
-            if job.log_lines:
-                all_log_lines.extend(job.log_lines)
-        
-        error_lines = extract_error_lines(all_log_lines)
-        ai_analysis = analyze_with_ai(
+        # Prepare job data for AI; each job is diagnosed from its own logs
+        job_data = [
+            {'name': job.name, 'conclusion': job.conclusion, 'log_lines': job.log_lines or []}
+            for job in report.failing_jobs
+        ]
+        ai_analysis = asyncio.run(analyze_with_ai(
             workflow_name=report.workflow_name,
             failing_jobs=job_data,
-            log_lines=all_log_lines,
-            error_lines=error_lines,
             api_key=openai_key
-        )
-    
-    if format_.lower() == "json":
-        output = json.loads(report_to_json(report))
+        ))
+
+    if json_output:
+        from .render import report_to_dict
+
+        payload = report_to_dict(report)
         if ai_analysis:
-            output['ai_analysis'] = ai_analysis
-        console.print(json.dumps(output, indent=2))
+            payload['ai_analysis'] = ai_analysis
+        # Plain write: Rich would wrap long lines and parse [markup] in log text
+        typer.echo(json.dumps(payload, indent=2))
     else:
+        from rich.panel import Panel
+        from rich.rule import Rule
+        from .render import render_report
+
         render_report(report, use_ai=False)
         if ai_analysis:
             console.print()
@@ -1,6 +1,6 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Protocol
+from typing import Any, BinaryIO, Dict, List, Optional, Protocol
 
 
 @dataclass
@@ -30,6 +30,7 @@ class JobMeta:
     completed_at: str | None
     steps: List[Dict[str, Any]]
     log_lines: List[str] | None = None  # Extracted log lines for this job
+    failing_step: Dict[str, Any] | None = None  # First step that failed/was cancelled
 
 
 @dataclass
@@ -44,7 +45,7 @@ class BaseProvider(Protocol):
     async def get_workflow_name(self, *, run: RunMeta) -> str: ...
     async def list_successful_runs(self, *, run: RunMeta, limit: int) -> List[RunMeta]: ...
     async def compare_since_last_success(self, *, current: RunMeta, last_success: RunMeta | None) -> CompareMeta | None: ...
-    async def download_logs_zip(self, *, run: RunMeta) -> bytes: ...
-    async def extract_logs_for_job(self, *, logs_zip: bytes, job: JobMeta) -> List[str] | None: ...
+    async def download_logs_zip(self, *, run: RunMeta) -> BinaryIO: ...
+    async def extract_logs_for_job(self, *, logs_zip: BinaryIO, job: JobMeta) -> List[str] | None: ...
 
 
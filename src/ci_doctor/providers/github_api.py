@@ -1,7 +1,50 @@
 from __future__ import annotations
+import hashlib
 import httpx
+import json
+import os
+import tempfile
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional
+
+
+# On-disk HTTP cache used with --cache; entries expire after a week
+DEFAULT_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "ci-doctor" / "http"
+CACHE_TTL_SECONDS = 7 * 24 * 3600
+
+
+class _TokenRedactingSerializer:
+    """
+    Wraps hishel's JSON serializer so the token never reaches the cache on disk.
+
+    hishel stores the request headers next to each response. The stored
+    Authorization value is replaced by a digest of the token and restored only
+    for the same token, so "Vary: Authorization" still matches on reuse while
+    entries written under a different token never do.
+    """
+    is_binary = False
+
+    def __init__(self, inner: Any, token: str):
+        self._inner = inner
+        self._authorization = f"Bearer {token}"
+        self._redacted = "sha256:" + hashlib.sha256(token.encode()).hexdigest()
+
+    def dumps(self, response: Any, request: Any, metadata: Any) -> str:
+        data = json.loads(self._inner.dumps(response, request, metadata))
+        data["request"]["headers"] = [
+            (key, self._redacted if key.lower() == "authorization" else value)
+            for key, value in data["request"]["headers"]
+        ]
+        return json.dumps(data, indent=4)
+
+    def loads(self, data: str | bytes) -> Any:
+        full = json.loads(data)
+        full["request"]["headers"] = [
+            (key, self._authorization if key.lower() == "authorization" and value == self._redacted else value)
+            for key, value in full["request"]["headers"]
+        ]
+        return self._inner.loads(json.dumps(full))
 
 
 class GitHubAuthError(Exception): ...
@@ -45,16 +88,44 @@ class GitHubClient:
     SECURITY: This client ONLY performs GET requests. It cannot modify,
     create, update, or delete any repository data, workflows, or runs.
     """
-    def __init__(self, token: str, api_base: str = "https://api.github.com", timeout: float = 10.0, use_cache: bool = False):
+    def __init__(self, token: str, api_base: str = "https://api.github.com", timeout: float = 10.0, use_cache: bool = False, cache_dir: Path = DEFAULT_CACHE_DIR, transport: httpx.AsyncBaseTransport | None = None):
+        if transport is None:
+            # HTTP/2 lets the concurrent requests from analyze() share one
+            # multiplexed connection instead of a TLS handshake each.
+            transport = httpx.AsyncHTTPTransport(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=8, max_connections=16, keepalive_expiry=30.0),
+                retries=2,  # connection-level retries for transient connect errors
+            )
+        if use_cache:
+            # Persist responses across invocations and revalidate them with
+            # ETags, so re-analyzing a run is mostly 304s with empty bodies.
+            import hishel
+
+            # Cached API responses are private to the user, and the token is
+            # kept out of the stored entries (see _TokenRedactingSerializer).
+            cache_dir = Path(cache_dir)
+            cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+            cache_dir.chmod(0o700)
+            transport = hishel.AsyncCacheTransport(
+                transport=transport,
+                storage=hishel.AsyncFileStorage(
+                    serializer=_TokenRedactingSerializer(hishel.JSONSerializer(), token),
+                    base_path=cache_dir,
+                    ttl=CACHE_TTL_SECONDS,
+                ),
+                controller=hishel.Controller(cacheable_methods=["GET"], allow_heuristics=True),
+            )
         self.client = httpx.AsyncClient(timeout=timeout, headers={
             "Authorization": f"Bearer {token}",
             "Accept": "application/vnd.github+json",
             "X-GitHub-Api-Version": "2022-11-28",
             "User-Agent": "ci-doctor/0.1",
-        }, follow_redirects=True)
+        }, follow_redirects=True, transport=transport)
         self.api_base = api_base.rstrip("/")
         self.use_cache = use_cache
-        self._etag: dict[str, str] = {}
+        # Workflow metadata only changes on rename, so it is fetched once per client
+        self._workflows: dict[tuple[str, str, int], dict] = {}
 
     async def aclose(self):
         await self.client.aclose()
@@ -66,18 +137,41 @@ class GitHubClient:
         SECURITY: No POST, PUT, PATCH, or DELETE operations are performed.
         This ensures the tool cannot modify repositories, workflows, or runs.
         """
-        headers = {}
-        if self.use_cache and url in self._etag:
-            headers["If-None-Match"] = self._etag[url]
-        r = await self.client.get(url, params=params or {}, headers=headers)
+        r = await self.client.get(url, params=params or {})
         if r.status_code == 401:
             raise GitHubAuthError("Unauthorized. Check token scopes (actions:read, contents:read).")
-        if r.status_code >= 400 and r.status_code != 304:
+        if r.status_code >= 400:
             raise GitHubAPIError(f"GET {url} -> {r.status_code} {r.text}")
-        if et := r.headers.get("ETag"):
-            self._etag[url] = et
         return r
 
+    async def _stream(self, url: str, params: dict | None = None) -> BinaryIO:
+        """
+        Read-only streaming GET into a temporary file.
+
+        Large bodies (logs ZIPs) are written chunk by chunk instead of being
+        buffered whole by httpx. The returned file is rewound and owned by
+        the caller, who must close it.
+        """
+        # A real file rather than SpooledTemporaryFile: before Python 3.11 the
+        # latter has no seekable(), which zipfile needs to open members
+        tmp = tempfile.TemporaryFile()
+        try:
+            # Log archives are large and fetched via one-off signed URLs, so
+            # they are never worth keeping in the HTTP cache.
+            async with self.client.stream("GET", url, params=params or {}, extensions={"cache_disabled": True}) as r:
+                if r.status_code == 401:
+                    raise GitHubAuthError("Unauthorized. Check token scopes (actions:read, contents:read).")
+                if r.status_code >= 400:
+                    await r.aread()
+                    raise GitHubAPIError(f"GET {url} -> {r.status_code} {r.text}")
+                async for chunk in r.aiter_bytes(1 << 20):
+                    tmp.write(chunk)
+        except BaseException:
+            tmp.close()
+            raise
+        tmp.seek(0)
+        return tmp
+
     async def get_run(self, owner: str, repo: str, run_id: int) -> GHRun:
         url = f"{self.api_base}/repos/{owner}/{repo}/actions/runs/{run_id}"
         r = await self._get(url)
@@ -101,8 +195,11 @@ class GitHubClient:
         return jobs
 
     async def get_workflow(self, owner: str, repo: str, workflow_id: int) -> dict:
-        url = f"{self.api_base}/repos/{owner}/{repo}/actions/workflows/{workflow_id}"
-        return (await self._get(url)).json()
+        key = (owner, repo, workflow_id)
+        if key not in self._workflows:
+            url = f"{self.api_base}/repos/{owner}/{repo}/actions/workflows/{workflow_id}"
+            self._workflows[key] = (await self._get(url)).json()
+        return self._workflows[key]
 
     async def list_success(self, owner: str, repo: str, workflow_id: int, branch: str, per_page: int = 50, page: int = 1) -> dict:
         url = f"{self.api_base}/repos/{owner}/{repo}/actions/workflows/{workflow_id}/runs"
@@ -112,8 +209,8 @@ class GitHubClient:
         url = f"{self.api_base}/repos/{owner}/{repo}/compare/{base}...{head}"
         return (await self._get(url)).json()
 
-    async def logs_zip(self, owner: str, repo: str, run_id: int) -> bytes:
+    async def logs_zip(self, owner: str, repo: str, run_id: int) -> BinaryIO:
         url = f"{self.api_base}/repos/{owner}/{repo}/actions/runs/{run_id}/logs"
-        return (await self._get(url)).content
+        return await self._stream(url)
 
 
@@ -1,10 +1,14 @@
 from __future__ import annotations
-from typing import List, Dict, Any, Optional
+from typing import BinaryIO, List, Dict, Any, Optional
 from .base import BaseProvider, RunMeta, JobMeta, CompareMeta
 from .github_api import GitHubClient
 from ..utils import parse_github_run_url
 
 
+def _first_failing_step(steps: List[Dict[str, Any]]) -> Dict[str, Any] | None:
+    return next((s for s in steps if (s.get("conclusion") or "").lower() in {"failure", "failed", "cancelled"}), None)
+
+
 class GitHubProvider(BaseProvider):
     def __init__(self, token: str, api_base: str = "https://api.github.com", timeout: float = 10.0, use_cache: bool = False):
         self.gh = GitHubClient(token=token, api_base=api_base, timeout=timeout, use_cache=use_cache)
@@ -25,7 +29,13 @@ class GitHubProvider(BaseProvider):
     async def list_run_jobs(self, *, run: RunMeta) -> List[JobMeta]:
         owner, repo = run.repo.split("/")
         jobs = await self.gh.list_jobs(owner, repo, int(run.id))
-        return [JobMeta(id=str(j.id), name=j.name, conclusion=j.conclusion, started_at=j.started_at, completed_at=j.completed_at, steps=j.steps, log_lines=None) for j in jobs]
+        return [
+            JobMeta(
+                id=str(j.id), name=j.name, conclusion=j.conclusion, started_at=j.started_at, completed_at=j.completed_at,
+                steps=j.steps, log_lines=None, failing_step=_first_failing_step(j.steps or []),
+            )
+            for j in jobs
+        ]
 
     async def get_workflow_name(self, *, run: RunMeta) -> str:
         owner, repo = run.repo.split("/")
@@ -53,7 +63,7 @@ class GitHubProvider(BaseProvider):
         data = await self.gh.compare(owner, repo, last_success.head_sha, current.head_sha)  # type: ignore
         return CompareMeta(total_commits=data.get("total_commits", 0), files=data.get("files", []))
 
-    async def download_logs_zip(self, *, run: RunMeta) -> bytes:
+    async def download_logs_zip(self, *, run: RunMeta) -> BinaryIO:
         owner, repo = run.repo.split("/")
         return await self.gh.logs_zip(owner, repo, int(run.id))
 
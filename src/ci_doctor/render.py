@@ -1,17 +1,20 @@
 from __future__ import annotations
-import json
+import re
+from itertools import islice
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
 from rich.rule import Rule
-from rich.syntax import Syntax
-from rich.markup import escape
+from rich.text import Text
 from .analysis import Report
+from .ai_analysis import ERROR_RE
 from .utils import iso_to_dt, duration_ms, human_ms
 
 
 console = Console()
 
+_ERROR_LINE_RE = re.compile(rf"^.*(?:{ERROR_RE.pattern}).*$", re.IGNORECASE | re.MULTILINE)
+
 
 def render_report(r: Report, use_ai: bool = False):
     dur_ms = duration_ms(iso_to_dt(r.run.started_at), iso_to_dt(r.run.updated_at))
@@ -40,7 +43,9 @@ def render_report(r: Report, use_ai: bool = False):
 
     if r.compare:
         files = r.compare.files or []
-        names = ", ".join(f.get("filename", "") for f in files[:5]) + ("…" if len(files) > 5 else "")
+        names = ", ".join(f.get("filename", "") for f in islice(files, 5))
+        more = "…" if len(files) > 5 else ""
+        names = f"{names}{more}"
         console.print(f"[bold]📦 Since last success ({r.compare.total_commits} commits):[/bold] {names or 'no file changes'}")
     console.print(Rule())
 
@@ -51,37 +56,18 @@ def render_report(r: Report, use_ai: bool = False):
 
     # Display log excerpts for all failing jobs
     for i, job in enumerate(r.failing_jobs):
-        # Find the failing step for this job
-        failing_step = None
-        for step in (job.steps or []):
-            if (step.get("conclusion") or "").lower() in {"failure", "failed", "cancelled"}:
-                failing_step = step
-                break
-        
-        step_name = failing_step.get("name") if failing_step else None
+        step_name = job.failing_step.get("name") if job.failing_step else None
         step_text = f" → step '{step_name}'" if step_name else ""
         
         console.print(Rule())
         console.print(f"[bold]📋 Failing Job {i+1}: {job.name}{step_text}[/bold]")
         
         if job.log_lines:
-            # Highlight error lines
-            error_patterns = ['error', 'Error', 'ERROR', 'failed', 'Failed', 'FAILED', 'fatal', 'Fatal', 'FATAL', 
-                              'Exception', 'Traceback', 'assertion failed', 'AssertionError']
-            
-            highlighted_lines = []
-            for line in job.log_lines:
-                # Escape rich markup in log lines to prevent conflicts
-                escaped_line = escape(line)
-                is_error = any(pattern in line for pattern in error_patterns)
-                if is_error:
-                    highlighted_lines.append(f"[red]{escaped_line}[/red]")
-                else:
-                    highlighted_lines.append(escaped_line)
-            
-            # Join and display
-            log_text = "\n".join(highlighted_lines)
-            
+            # Highlight whole error lines in one regex pass over the joined
+            # text; a Text object needs no markup escaping of log content.
+            log_text = Text("\n".join(job.log_lines))
+            log_text.highlight_regex(_ERROR_LINE_RE, style="red")
+
             # Display in a panel
             console.print(Panel(log_text, title=f"Logs for {job.name}", border_style="red", expand=False))
 
@@ -95,8 +81,9 @@ def render_report(r: Report, use_ai: bool = False):
         console.print(tbl)
 
 
-def report_to_json(r: Report) -> str:
-    payload = {
+def report_to_dict(r: Report) -> dict:
+    """JSON-ready payload for --format json; callers serialize it once."""
+    return {
         "run": {
             "id": r.run.id,
             "provider": r.run.provider,
@@ -136,6 +123,5 @@ def report_to_json(r: Report) -> str:
         "suspects": r.suspects,
         "logs_path": str(r.logs_path) if r.logs_path else None,
     }
-    return json.dumps(payload, indent=2)
 
 
@@ -1,10 +1,43 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
+from collections import deque
+from typing import BinaryIO, Iterator
 from urllib.parse import urlparse
+import io
+import os
+import re
+import sys
+import zipfile
 
 
-@dataclass
+# Step/job log members are named "<index>_<name>.txt"
+_LOG_NAME_RE = re.compile(r'^\d+_(.+)\.txt$')
+
+# https://github.com/<owner>/<repo>/actions/runs/<id>. The scheme is matched
+# case-insensitively (the host is not), empty path segments ("//") are skipped
+# and the id may be padded with whitespace, as int() allows
+_RUN_URL_RE = re.compile(r'^(?i:https?)://(?:www\.)?github\.com/+([^/?#]+)/+([^/?#]+)/+actions/+runs/+\s*(\d+)\s*(?:[/?#]|$)')
+
+# Error/failure lines (common patterns), matched on raw bytes: every pattern is
+# ASCII, so only emitted lines are decoded. Searched in the lowercased log,
+# which covers Error:/ERROR: etc. and runs several times faster than IGNORECASE
+_ERROR_RE = re.compile(
+    rb'error:|failed:|fatal:|assertion failed|assertionerror|exception:|traceback|exit code|exit status|command failed'
+)
+# Lowercase stems, one of which every _ERROR_RE match contains
+_ERROR_STEMS = (b"error", b"fail", b"fatal", b"exception", b"traceback", b"exit ")
+
+# Line breaks other than "\n" that str.splitlines() honours: \r, \v, \f,
+# \x1c-\x1e and the UTF-8 encodings of U+0085, U+2028 and U+2029
+_EXTRA_BREAKS = (b"\r", b"\x0b", b"\x0c", b"\x1c", b"\x1d", b"\x1e", b"\xc2\x85", b"\xe2\x80\xa8", b"\xe2\x80\xa9")
+
+# Logs are decompressed and split in blocks of this size
+_READ_CHUNK = 1 << 16
+
+
+@dataclass(slots=True, frozen=True)
 class ParsedRunURL:
     owner: str
     repo: str
@@ -12,19 +45,28 @@ class ParsedRunURL:
 
 
 def parse_github_run_url(url: str) -> ParsedRunURL:
-    u = urlparse(url)
-    if u.netloc not in {"github.com", "www.github.com"}:
-        raise ValueError("URL host is not github.com")
-    parts = [p for p in u.path.split("/") if p]
-    # /owner/repo/actions/runs/<id>
-    if len(parts) < 5 or parts[2] != "actions" or parts[3] != "runs":
+    # /owner/repo/actions/runs/<id>, optionally followed by /attempts/N, a query, ...
+    # Pasted URLs often carry surrounding whitespace
+    url = url.strip()
+    m = _RUN_URL_RE.match(url)
+    if m is None:
+        # Only failures pay for a full parse, to keep the clearer host error
+        if urlparse(url).netloc not in {"github.com", "www.github.com"}:
+            raise ValueError("URL host is not github.com")
         raise ValueError("Not a GitHub Actions run URL")
-    owner, repo, _, _, run_id = parts[:5]
-    return ParsedRunURL(owner=owner, repo=repo, run_id=int(run_id))
+    owner, repo, run_id = m.groups()
+    # Runs of the same repo share one owner/repo string each
+    return ParsedRunURL(owner=sys.intern(owner), repo=sys.intern(repo), run_id=int(run_id))
 
 
-def iso_to_dt(s: str) -> datetime:
-    return datetime.fromisoformat(s.replace("Z", "+00:00"))
+# The same run timestamps are parsed by analysis, suspects and rendering
+if sys.version_info >= (3, 11):
+    # fromisoformat() accepts the trailing "Z" natively
+    iso_to_dt = lru_cache(maxsize=4096)(datetime.fromisoformat)
+else:
+    @lru_cache(maxsize=4096)
+    def iso_to_dt(s: str) -> datetime:
+        return datetime.fromisoformat(s.replace("Z", "+00:00"))
 
 
 def duration_ms(start: datetime, end: datetime) -> int:
@@ -34,151 +76,256 @@ def duration_ms(start: datetime, end: datetime) -> int:
 def median_ms(values: list[int]) -> int:
     if not values:
         return 0
+    # Baselines hold at most a page of runs; timsort beats heapq/statistics
+    # partial selection at every size measured, so a full sort stays
     xs = sorted(values)
-    n = len(xs)
-    return xs[n // 2] if n % 2 == 1 else (xs[n // 2 - 1] + xs[n // 2]) // 2
+    mid = len(xs) // 2
+    return xs[mid] if len(xs) & 1 else (xs[mid - 1] + xs[mid]) // 2
 
 
 def human_ms(ms: int | None) -> str:
     if ms is None:
         return "n/a"
-    s = ms / 1000
+    s = ms // 1000
     if s < 60:
-        return f"{int(s)}s"
-    m, s = divmod(int(s), 60)
+        return f"{s}s"
+    m, s = divmod(s, 60)
     if m < 60:
         return f"{m}m{s:02d}s"
     h, m = divmod(m, 60)
     return f"{h}h{m:02d}m"
 
 
-def extract_failing_step_logs(logs_zip: bytes, failing_job_name: str, failing_step_name: str | None, max_lines: int = 50, context_lines: int = 5) -> list[str] | None:
+class LogZipIndex:
     """
-    Extract log lines from GitHub Actions logs ZIP for a failing step.
-    
-    Smart extraction: Finds error/failure lines and returns context around them.
-    If no errors found, returns the last max_lines.
-    
-    Returns list of log lines with context, or None if not found.
+    GitHub Actions logs ZIP, opened once per run.
+
+    The central directory is parsed a single time and step/job log files are
+    indexed by normalized name, so extracting logs for several failing jobs
+    only decompresses the members that are actually needed.
     """
-    import sys
-    import zipfile
-    import io
-    import re
-    
-    try:
-        with zipfile.ZipFile(io.BytesIO(logs_zip), 'r') as zip_ref:
-            # GitHub Actions can have two structures:
-            # 1. Flat structure: files like "1_Step name.txt" at root
-            # 2. Nested structure: files in folders like "123_Job/1_Step name.txt"
-            
-            log_file = None
-            
-            # Try to find the log file by matching step name
-            if failing_step_name:
-                # Try flat structure first (most common for simple workflows)
-                # Look for files like "1_Step name.txt"
-                step_pattern = re.compile(rf'^\d+_{re.escape(failing_step_name)}.txt$', re.IGNORECASE)
-                for name in zip_ref.namelist():
-                    # Check if it's a flat structure file
-                    if '/' not in name and step_pattern.match(name):
-                        log_file = name
-                        break
-                    
-                    # Check if it's in a nested structure
-                    parts = name.split('/')
-                    if len(parts) == 2 and step_pattern.match(parts[1]):
-                        log_file = name
-                        break
-                
-                # If no exact match, try partial match
-                if not log_file:
-                    for name in zip_ref.namelist():
-                        if failing_step_name.lower() in name.lower() and name.endswith('.txt'):
-                            log_file = name
-                            break
-            
-            # If still no match and we have a job name, try to find by job name
-            if not log_file and failing_job_name:
-                # Try exact match first with regex
-                job_pattern = re.compile(rf'^\d+_{re.escape(failing_job_name)}.txt$', re.IGNORECASE)
-                for name in zip_ref.namelist():
-                    # Check flat or nested
-                    basename = name.split('/')[-1] if '/' in name else name
-                    if job_pattern.match(basename):
-                        log_file = name
-                        break
-                
-                # If no exact match, try partial match
-                if not log_file:
-                    job_pattern = re.compile(rf'^\d+_{re.escape(failing_job_name.replace(" ", "_"))}', re.IGNORECASE)
-                    for name in zip_ref.namelist():
-                        basename = name.split('/')[-1] if '/' in name else name
-                        if job_pattern.match(basename) and name.endswith('.txt') and 'system' not in name.lower():
-                            log_file = name
-                            break
-            
+
+    def __init__(self, logs_zip: bytes | str | os.PathLike[str] | BinaryIO):
+        # Paths and seekable file objects (e.g. a streamed download) are read in
+        # place; ZipFile opens and closes a path itself
+        src = io.BytesIO(logs_zip) if isinstance(logs_zip, (bytes, bytearray)) else logs_zip
+        self.zf = zipfile.ZipFile(src, 'r')
+        # Walk the central directory once (infolist() is not copied, unlike
+        # namelist()), keeping only .txt log members with their lowercased
+        # names and basenames, so lookups never re-split or re-lower paths
+        self.infos = [info for info in self.zf.infolist() if info.filename.endswith('.txt')]
+        self.basenames = [info.filename.rsplit('/', 1)[-1] for info in self.infos]
+        self.lower_names = [info.filename.lower() for info in self.infos]
+        # GitHub Actions can have two structures:
+        # 1. Flat structure: files like "1_Step name.txt" at root
+        # 2. Nested structure: files in folders like "123_Job/1_Step name.txt"
+        # Step names only match at those two levels; job names at any depth.
+        self.step_index: dict[str, zipfile.ZipInfo] = {}
+        self.job_index: dict[str, zipfile.ZipInfo] = {}
+        for info, base in zip(self.infos, self.basenames):
+            key = _normalize_log_name(base)
+            if key is None:
+                continue
+            self.job_index.setdefault(key, info)
+            if info.filename.count('/') <= 1:
+                self.step_index.setdefault(key, info)
+
+    def close(self) -> None:
+        self.zf.close()
+
+    def __enter__(self) -> LogZipIndex:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def find(self, failing_job_name: str, failing_step_name: str | None) -> zipfile.ZipInfo | None:
+        """Return the ZIP member holding the failing step's log, falling back to the job's."""
+        step_lower = failing_step_name.lower() if failing_step_name else None
+        # Try to find the log file by matching step name
+        if step_lower:
+            log_file = self.step_index.get(step_lower)
+            if log_file:
+                return log_file
+
+        # Exact job match ranks below a partial step match, so only remember it
+        job_exact = self.job_index.get(failing_job_name.lower()) if failing_job_name else None
+        job_pattern = _job_prefix_regex(failing_job_name) if failing_job_name and not job_exact else None
+
+        if not step_lower and not job_pattern:
+            return job_exact
+
+        # One scan covers the partial step match and the partial job fallback
+        job_partial = None
+        for info, lower, base in zip(self.infos, self.lower_names, self.basenames):
+            if step_lower and step_lower in lower:
+                return info
+            if job_pattern and job_partial is None and job_pattern.match(base) and 'system' not in lower:
+                job_partial = info
+                if not step_lower:
+                    break
+
+        return job_exact or job_partial
+
+    def _iter_blocks(self, log_file: zipfile.ZipInfo) -> Iterator[tuple[list[bytes], bytes]]:
+        """
+        Stream a member as blocks of whole raw lines, split the way the decoded
+        str.splitlines() would. Each block's lines come with the block itself,
+        lines joined by "\n", so it can be scanned in bulk.
+        """
+        # Opening by ZipInfo skips the name lookup
+        with self.zf.open(log_file) as fh:
+            pending = b''
+            while chunk := fh.read(_READ_CHUNK):
+                data = pending + chunk
+                cut = data.rfind(b'\n')
+                if cut < 0:
+                    pending = data
+                    continue
+                pending = data[cut + 1:]
+                yield _split_block(data[:cut], eol=True)
+            if pending:
+                yield _split_block(pending, eol=False)
+
+    def extract(self, failing_job_name: str, failing_step_name: str | None, max_lines: int = 50, context_lines: int = 5) -> list[str] | None:
+        """
+        Extract log lines for a failing step.
+
+        Smart extraction: Finds error/failure lines and returns context around them.
+        If no errors found, returns the last max_lines.
+
+        Returns list of log lines with context, or None if not found.
+        """
+        try:
+            log_file = self.find(failing_job_name, failing_step_name)
             if not log_file:
                 return None
-            
-            # Read the log file
-            log_content = zip_ref.read(log_file).decode('utf-8', errors='replace')
-            
-            lines = log_content.splitlines()
-            
-            # Find error/failure lines (common patterns)
-            error_patterns = [
-                r'error:',
-                r'Error:',
-                r'ERROR:',
-                r'failed:',
-                r'Failed:',
-                r'FAILED:',
-                r'fatal:',
-                r'Fatal:',
-                r'FATAL:',
-                r'assertion failed',
-                r'AssertionError',
-                r'Exception:',
-                r'Traceback',
-                r'exit code',
-                r'exit status',
-                r'Command failed',
-            ]
-            
-            error_indices = []
-            for i, line in enumerate(lines):
-                if any(re.search(pattern, line, re.IGNORECASE) for pattern in error_patterns):
-                    error_indices.append(i)
-            
-            # If we found errors, return context around them
-            if error_indices:
-                # Collect unique lines with context around errors
-                result_lines = []
-                result_indices = set()
-                
+
+            # Single streaming pass: pre holds the not-yet-emitted lines that may
+            # become leading context, after counts trailing context still owed,
+            # and out keeps only the last max_lines emitted lines
+            pre: deque[bytes] = deque(maxlen=context_lines)
+            out: deque[bytes] = deque(maxlen=max_lines)
+            tail: deque[bytes] = deque(maxlen=max_lines)
+            after = 0
+            found = False
+            for lines, block in self._iter_blocks(log_file):
+                tail.extend(lines)
+                # Lines between errors are moved in slices rather than one by one
+                pos = 0
+                error_indices = _error_indices(block, max_lines + 1)
+                if len(error_indices) > max_lines:
+                    # The last max_lines errors alone refill out, so anything
+                    # emitted up to the error before them is dropped anyway
+                    out.clear()
+                    pre.clear()
+                    pos = error_indices.pop(0) + 1
+                    after = context_lines
                 for err_idx in error_indices:
-                    start = max(0, err_idx - context_lines)
-                    end = min(len(lines), err_idx + context_lines + 1)
-                    
-                    for idx in range(start, end):
-                        if idx not in result_indices:
-                            result_indices.add(idx)
-                            result_lines.append((idx, lines[idx]))
-                
-                # Sort by index and return lines
-                result_lines.sort()
-                # Limit total output
-                if len(result_lines) > max_lines:
-                    # Keep the lines around the last error
-                    return [line for _, line in result_lines[-max_lines:]]
-                return [line for _, line in result_lines]
-            
-            # No errors found, return the last max_lines
-            return lines[-max_lines:] if len(lines) > max_lines else lines
-            
-    except Exception as e:
-        # Silently fail if log extraction fails
-        return None
+                    found = True
+                    if after:
+                        take = min(after, err_idx - pos)
+                        out.extend(lines[pos:pos + take])
+                        after -= take
+                        pos += take
+                    pre.extend(lines[max(pos, err_idx - context_lines):err_idx])
+                    out.extend(pre)
+                    pre.clear()
+                    out.append(lines[err_idx])
+                    after = context_lines
+                    pos = err_idx + 1
+                if after:
+                    take = min(after, len(lines) - pos)
+                    out.extend(lines[pos:pos + take])
+                    after -= take
+                    pos += take
+                pre.extend(lines[max(pos, len(lines) - context_lines):])
+
+            # No errors found, return the last max_lines; otherwise the context
+            # around errors, keeping the lines around the last error
+            return [line.decode('utf-8', errors='replace') for line in (out if found else tail)]
+
+        except Exception:
+            # Silently fail if log extraction fails
+            return None
+
+
+def _split_block(data: bytes, eol: bool) -> tuple[list[bytes], bytes]:
+    """Split raw log text into lines; eol means data was followed by a "\n"."""
+    # Separate substring probes are much cheaper than one regex over the block
+    if not any(sep in data for sep in _EXTRA_BREAKS):
+        # Plain "\n"-separated text: the common case
+        return data.split(b'\n'), data
+    # Rare: decode to split on "\r" and the other separators str knows
+    text = data.decode('utf-8', errors='replace') + ('\n' if eol else '')
+    lines = [line.encode('utf-8') for line in text.splitlines()]
+    return lines, b'\n'.join(lines)
+
+
+def _error_indices(block: bytes, limit: int) -> list[int]:
+    """Indices of the last (at most limit) error lines in a block (its lines joined by "\n")."""
+    # Every _ERROR_RE match contains one of the stems, so a few C-level finds
+    # over the whole block skip clean lines; only lines holding a stem reach
+    # the regex. Bound methods are hoisted out of these per-hit loops.
+    low = block.lower()
+    find = low.find
+    line_ends = set()
+    add = line_ends.add
+    for stem in _ERROR_STEMS:
+        i = find(stem)
+        while i >= 0:
+            end = find(b'\n', i)
+            if end < 0:
+                add(len(low))
+                break
+            add(end)
+            i = find(stem, end)
+
+    # Confirm from the end: earlier errors cannot reach the output once limit
+    # later ones are known
+    rfind = low.rfind
+    search = _ERROR_RE.search
+    error_ends = []
+    for end in sorted(line_ends, reverse=True):
+        if search(low, rfind(b'\n', 0, end) + 1, end):
+            error_ends.append(end)
+            if len(error_ends) == limit:
+                break
+
+    indices = []
+    idx = prev = 0
+    for end in reversed(error_ends):
+        idx += low.count(b'\n', prev, end)
+        prev = end
+        indices.append(idx)
+    return indices
+
 
+def _normalize_log_name(basename: str) -> str | None:
+    """Map "1_Step name.txt" to "step name", or None for other members."""
+    m = _LOG_NAME_RE.match(basename)
+    return m.group(1).lower() if m else None
 
+
+@lru_cache(maxsize=256)
+def _job_prefix_regex(job_name: str) -> re.Pattern[str]:
+    """Partial job match: "<index>_<job name, spaces as underscores>" at the start of a basename."""
+    return re.compile(rf'^\d+_{re.escape(job_name.replace(" ", "_"))}', re.IGNORECASE)
+
+
+def extract_failing_step_logs(logs_zip: bytes | str | os.PathLike[str] | BinaryIO, failing_job_name: str, failing_step_name: str | None, max_lines: int = 50, context_lines: int = 5) -> list[str] | None:
+    """
+    Extract log lines from GitHub Actions logs ZIP for a failing step.
+
+    One-off convenience wrapper around LogZipIndex; prefer building the index
+    once when extracting logs for several jobs of the same run. logs_zip may
+    be the archive bytes, a path, or a seekable binary file, read in place.
+
+    Returns list of log lines with context, or None if not found.
+    """
+    try:
+        with LogZipIndex(logs_zip) as index:
+            return index.extract(failing_job_name, failing_step_name, max_lines=max_lines, context_lines=context_lines)
+    except Exception:
+        # Silently fail if the archive cannot be opened
+        return None
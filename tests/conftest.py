@@ -0,0 +1,18 @@
+import io
+import zipfile
+
+import pytest
+
+
+def _build_logs_zip(members: dict[str, str]) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        for name, text in members.items():
+            zf.writestr(name, text)
+    return buf.getvalue()
+
+
+@pytest.fixture
+def logs_zip():
+    """Build a GitHub Actions style logs ZIP from {member name: text}."""
+    return _build_logs_zip
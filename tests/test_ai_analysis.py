@@ -0,0 +1,111 @@
+import asyncio
+import sys
+import types
+
+from ci_doctor.ai_analysis import (
+    MAX_LINE_CHARS,
+    PROMPT_TOKEN_BUDGET,
+    _approx_tokens,
+    _build_prompt,
+    _clip,
+    _tail_within,
+    analyze_with_ai,
+)
+
+
+class _StubCompletions:
+    def __init__(self, prompts: list[str]):
+        self.prompts = prompts
+
+    async def create(self, *, messages, **kwargs):
+        prompt = messages[1]["content"]
+        self.prompts.append(prompt)
+        if "Failed Job: lint" in prompt:
+            raise RuntimeError("rate limited")
+        job = prompt.split("Failed Job: ", 1)[1].split(" ", 1)[0]
+        message = types.SimpleNamespace(content=f" fix {job} ")
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+
+def _stub_openai(monkeypatch) -> list[str]:
+    prompts: list[str] = []
+
+    class StubAsyncOpenAI:
+        def __init__(self, **kwargs):
+            self.chat = types.SimpleNamespace(completions=_StubCompletions(prompts))
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return None
+
+    module = types.ModuleType("openai")
+    module.AsyncOpenAI = StubAsyncOpenAI
+    monkeypatch.setitem(sys.modules, "openai", module)
+    return prompts
+
+
+def _job(name: str) -> dict:
+    return {"name": name, "conclusion": "failure", "log_lines": [f"Error: {name} broke"]}
+
+
+def test_analyze_with_ai_one_request_per_job(monkeypatch):
+    prompts = _stub_openai(monkeypatch)
+    jobs = [_job("build"), _job("lint"), _job("test")]
+    result = asyncio.run(analyze_with_ai("CI", jobs, "sk"))
+    assert sorted(p.split("Failed Job: ", 1)[1].split(" ", 1)[0] for p in prompts) == ["build", "lint", "test"]
+    assert all("Error: build broke" in p for p in prompts if "Failed Job: build" in p)
+    # One failing request is reported for its job only
+    assert result == "build:\nfix build\n\nlint:\nAI analysis failed: rate limited\n\ntest:\nfix test"
+
+
+def test_analyze_with_ai_single_job_has_no_prefix(monkeypatch):
+    _stub_openai(monkeypatch)
+    assert asyncio.run(analyze_with_ai("CI", [_job("build")], "sk")) == "fix build"
+
+
+def _sections(prompt: str) -> tuple[list[str], list[str]]:
+    """Split a prompt into its (recent logs, key errors) excerpt lines."""
+    logs = prompt.split("Recent Logs:\n```\n", 1)[1].split("\n```", 1)[0]
+    errors = prompt.split("Key Error Messages:\n```\n", 1)[1].split("\n```", 1)[0]
+    return logs.split("\n") if logs else [], errors.split("\n") if errors else []
+
+
+def _cost(lines: list[str]) -> int:
+    return sum(map(_approx_tokens, lines))
+
+
+def test_clip_and_tail_within():
+    assert _clip("short") == "short"
+    clipped = _clip("x" * (MAX_LINE_CHARS * 10))
+    assert len(clipped) == MAX_LINE_CHARS + 1 and clipped.endswith("…")
+    lines = [f"line {i}" for i in range(100)]
+    kept = _tail_within(lines, 20)
+    assert kept == lines[-len(kept):] and _cost(kept) <= 20
+    assert _tail_within(lines, 0) == []
+
+
+def test_prompt_excerpt_fits_budget_in_chronological_order():
+    log_lines = [f"step output {i:05d} " + "." * 40 for i in range(5000)]
+    logs, errors = _sections(_build_prompt("CI", {"name": "build", "log_lines": log_lines}))
+    assert errors == []
+    assert logs == log_lines[-len(logs):]
+    assert _cost(logs) <= PROMPT_TOKEN_BUDGET
+    assert _cost(log_lines[-len(logs) - 1:]) > PROMPT_TOKEN_BUDGET
+
+
+def test_prompt_clips_one_huge_line_instead_of_spending_the_budget():
+    log_lines = ["before", "x" * 200_000, "Error: boom"]
+    logs, errors = _sections(_build_prompt("CI", {"name": "build", "log_lines": log_lines}))
+    assert logs == ["before", "x" * MAX_LINE_CHARS + "…", "Error: boom"]
+    assert errors == ["Error: boom"]
+
+
+def test_prompt_error_lines_capped_at_half_the_budget():
+    log_lines = [f"Error: failure number {i:05d} " + "!" * 40 for i in range(5000)]
+    logs, errors = _sections(_build_prompt("CI", {"name": "build", "log_lines": log_lines}))
+    assert errors == log_lines[-len(errors):]
+    assert 0 < _cost(errors) <= PROMPT_TOKEN_BUDGET // 2
+    assert _cost(errors) + _cost(logs) <= PROMPT_TOKEN_BUDGET
+    assert logs == log_lines[-len(logs):]
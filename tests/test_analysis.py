@@ -0,0 +1,82 @@
+import asyncio
+import tempfile
+
+from ci_doctor.analysis import analyze
+from ci_doctor.providers.base import JobMeta, RunMeta
+
+
+def _run(conclusion: str) -> RunMeta:
+    return RunMeta(
+        id="5", provider="github", repo="o/r", branch="main", event="push", actor="me",
+        status="completed", conclusion=conclusion, run_attempt=1,
+        started_at="2024-01-02T00:00:00Z", updated_at="2024-01-02T00:10:00Z",
+        head_sha="bbb", web_url="https://github.com/o/r/actions/runs/5", workflow_id="9",
+    )
+
+
+def _job(name: str, conclusion: str, failing_step: dict | None = None) -> JobMeta:
+    return JobMeta(id=name, name=name, conclusion=conclusion, started_at=None, completed_at=None, steps=[], failing_step=failing_step)
+
+
+class FakeProvider:
+    def __init__(self, run: RunMeta, jobs: list[JobMeta], logs_zip: bytes = b""):
+        self.run = run
+        self.jobs = jobs
+        self.logs_zip = logs_zip
+        self.downloads = []
+
+    async def get_run(self, *, run_url):
+        return self.run
+
+    async def list_run_jobs(self, *, run):
+        return self.jobs
+
+    async def get_workflow_name(self, *, run):
+        return "CI"
+
+    async def list_successful_runs(self, *, run, limit):
+        return []
+
+    async def compare_since_last_success(self, *, current, last_success):
+        return None
+
+    async def download_logs_zip(self, *, run):
+        fh = tempfile.TemporaryFile()
+        fh.write(self.logs_zip)
+        fh.seek(0)
+        self.downloads.append(fh)
+        return fh
+
+
+def _analyze(provider, **kwargs):
+    return asyncio.run(analyze(provider, run_url="https://github.com/o/r/actions/runs/5", **kwargs))
+
+
+def test_failed_run_without_failing_step_skips_logs_download():
+    provider = FakeProvider(_run("failure"), [_job("build", "failure")])
+    report = _analyze(provider)
+    assert provider.downloads == []
+    assert report.failing_jobs[0].log_lines is None
+
+
+def test_failed_step_logs_are_downloaded_and_extracted(logs_zip):
+    blob = logs_zip({"build/1_Run tests.txt": "ok\nError: boom\n"})
+    provider = FakeProvider(_run("failure"), [_job("build", "failure", {"name": "Run tests"})], blob)
+    report = _analyze(provider)
+    assert len(provider.downloads) == 1 and provider.downloads[0].closed
+    assert report.failing_jobs[0].log_lines == ["ok", "Error: boom"]
+
+
+def test_cancellation_reason_without_logs():
+    provider = FakeProvider(_run("cancelled"), [_job("build", "failure"), _job("test", "cancelled")])
+    report = _analyze(provider)
+    assert provider.downloads == []
+    assert report.cancellation_reason == "Cancelled after a failure in another job"
+
+
+def test_save_logs_copies_streamed_zip(logs_zip, tmp_path):
+    blob = logs_zip({"build/1_Run tests.txt": "Error: boom\n" * 1000})
+    provider = FakeProvider(_run("failure"), [_job("build", "failure", {"name": "Run tests"})], blob)
+    report = _analyze(provider, want_logs=True, save_logs_dir=tmp_path / "logs")
+    assert report.logs_path == tmp_path / "logs" / "run-5-logs.zip"
+    assert report.logs_path.read_bytes() == blob
@@ -0,0 +1,60 @@
+import asyncio
+import email.utils
+
+import httpx
+
+from ci_doctor.providers.github_api import GitHubClient
+from ci_doctor.utils import LogZipIndex
+
+
+def test_streamed_logs_zip_opens_in_log_zip_index(logs_zip):
+    blob = logs_zip({"build/1_Run tests.txt": "ok\nError: boom\n"})
+
+    async def fetch():
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, content=blob))
+        gh = GitHubClient("t", api_base="https://gh.test", transport=transport)
+        try:
+            return await gh.logs_zip("o", "r", 1)
+        finally:
+            await gh.aclose()
+
+    fh = asyncio.run(fetch())
+    try:
+        with LogZipIndex(fh) as index:
+            assert index.extract("build", "Run tests") == ["ok", "Error: boom"]
+    finally:
+        fh.close()
+
+
+def test_http_cache_never_stores_the_token(tmp_path):
+    cache_dir = tmp_path / "http"
+    calls = []
+
+    def handler(request):
+        calls.append(request.headers["Authorization"])
+        return httpx.Response(200, json={"id": 9}, headers={
+            "Cache-Control": "private, max-age=60",
+            "Date": email.utils.formatdate(usegmt=True),
+            "ETag": '"abc"',
+            "Vary": "Accept, Authorization",
+        })
+
+    async def get_workflow(token):
+        gh = GitHubClient(token, api_base="https://gh.test", use_cache=True, cache_dir=cache_dir, transport=httpx.MockTransport(handler))
+        try:
+            return await gh.get_workflow("o", "r", 9)
+        finally:
+            await gh.aclose()
+
+    assert asyncio.run(get_workflow("ghp_SECRET123")) == {"id": 9}
+    # Served from the cache for the same token, refetched for another one
+    asyncio.run(get_workflow("ghp_SECRET123"))
+    asyncio.run(get_workflow("ghp_OTHER456"))
+    assert calls == ["Bearer ghp_SECRET123", "Bearer ghp_OTHER456"]
+
+    assert cache_dir.stat().st_mode & 0o777 == 0o700
+    files = [p for p in cache_dir.rglob("*") if p.is_file()]
+    assert files
+    for path in files:
+        content = path.read_bytes()
+        assert b"SECRET123" not in content and b"OTHER456" not in content
@@ -8,12 +8,32 @@ def test_parse_valid_run_url():
     assert p.owner == "owner"
     assert p.repo == "repo"
     assert p.run_id == 123456789
+    assert p == parse_github_run_url(url) and len({p, parse_github_run_url(url)}) == 1
+
+
+def test_parse_run_url_with_suffix():
+    p = parse_github_run_url("https://www.github.com/owner/repo/actions/runs/42/attempts/2?pr=7")
+    assert (p.owner, p.repo, p.run_id) == ("owner", "repo", 42)
+
+
+@pytest.mark.parametrize("url", [
+    "https://github.com/o/r/actions/runs/1 ",
+    "  https://github.com/o/r/actions/runs/1\n",
+    "https://github.com//o/r/actions/runs/1",
+    "https://github.com/o//r/actions//runs/1/",
+    "Https://github.com/o/r/actions/runs/1",
+    "HTTPS://github.com/o/r/actions/runs/1",
+])
+def test_parse_run_url_tolerates_whitespace_and_empty_segments(url):
+    p = parse_github_run_url(url)
+    assert (p.owner, p.repo, p.run_id) == ("o", "r", 1)
 
 
 @pytest.mark.parametrize("url", [
     "https://example.com/owner/repo/actions/runs/1",
     "https://github.com/owner/repo/actions/workflows/1",
     "https://github.com/owner/repo/runs/1",
+    "https://github.com/owner/repo/actions/runs/abc",
 ])
 def test_parse_invalid_urls(url):
     with pytest.raises(ValueError):
@@ -1,5 +1,6 @@
+import tempfile
 from datetime import datetime, timezone, timedelta
-from ci_doctor.utils import iso_to_dt, duration_ms, median_ms, human_ms
+from ci_doctor.utils import iso_to_dt, duration_ms, median_ms, human_ms, extract_failing_step_logs, LogZipIndex
 
 
 def test_iso_to_dt_z_and_offset():
@@ -28,3 +29,58 @@ def test_human_ms():
     assert human_ms(3_900_000) == "1h05m"
 
 
+def test_extract_failing_step_logs_by_step_name(logs_zip):
+    blob = logs_zip({
+        "build/1_Set up job.txt": "setting up\n",
+        "build/2_Run tests.txt": "\n".join(["ok"] * 20 + ["Error: boom"] + ["after"] * 20),
+    })
+    lines = extract_failing_step_logs(blob, "build", "Run tests", context_lines=2)
+    assert lines == ["ok", "ok", "Error: boom", "after", "after"]
+
+
+def test_extract_failing_step_logs_falls_back_to_job_and_tail(logs_zip, tmp_path):
+    blob = logs_zip({"3_lint.txt": "\n".join(str(i) for i in range(100))})
+    assert extract_failing_step_logs(blob, "lint", None, max_lines=3) == ["97", "98", "99"]
+    assert extract_failing_step_logs(blob, "missing", "Nope") is None
+    with tempfile.TemporaryFile() as fh:
+        fh.write(blob)
+        fh.seek(0)
+        assert extract_failing_step_logs(fh, "lint", None, max_lines=1) == ["99"]
+    path = tmp_path / "logs.zip"
+    path.write_bytes(blob)
+    assert extract_failing_step_logs(path, "lint", None, max_lines=1) == ["99"]
+
+
+def test_log_zip_index_reused_across_jobs(logs_zip):
+    blob = logs_zip({
+        "a/1_Build.txt": "fatal: a\n",
+        "b/1_Test.txt": "fatal: b\n",
+    })
+    with LogZipIndex(blob) as index:
+        assert index.extract("a", "Build") == ["fatal: a"]
+        assert index.extract("b", "Test") == ["fatal: b"]
+
+
+def test_extract_job_log_at_any_depth(logs_zip):
+    blob = logs_zip({"1_build_cache.txt": "cache\n", "run/jobs/2_build.txt": "fatal: deep\n"})
+    # An exact job-name match two folders down beats an earlier partial one
+    assert extract_failing_step_logs(blob, "build", None) == ["fatal: deep"]
+
+
+def test_extract_splits_like_str_splitlines(logs_zip):
+    blob = logs_zip({"1_Build.txt": "café\r\nprogress\rdone\x0cERROR: boom\nnext\n"})
+    lines = extract_failing_step_logs(blob, "x", "Build", context_lines=1)
+    assert lines == ["done", "ERROR: boom", "next"]
+    assert extract_failing_step_logs(blob, "x", "Build", context_lines=5)[0] == "café"
+
+
+def test_extract_merges_overlapping_error_windows(logs_zip):
+    log = ["a", "b", "Traceback (most recent call last):", "Exception: one", "c", "error: two", "d", "e", "f"]
+    blob = logs_zip({"1_Test.txt": "\n".join(log)})
+    assert extract_failing_step_logs(blob, "x", "Test", context_lines=1) == log[1:7]
+
+
+def test_extract_every_line_an_error(logs_zip):
+    blob = logs_zip({"1_Parse.txt": "\n".join(f"error: line {i}" for i in range(10_000))})
+    lines = extract_failing_step_logs(blob, "x", "Parse", max_lines=3, context_lines=2)
+    assert lines == ["error: line 9997", "error: line 9998", "error: line 9999"]